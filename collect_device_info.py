@@ -1,46 +1,55 @@
 import os
-import json
+import re
 import time
 from pathlib import Path
-from urllib.parse import urljoin
 
+import orjson
 import requests
+import urllib3
 from dotenv import load_dotenv
 
 # Load .env
 load_dotenv()
 
 HOST = os.getenv("DEVICE_HOST", "").rstrip("/")
+# Every lookup hits HOST + /restconf/data/<path>
+BASE_URL = f"{HOST}/restconf/data/"
 USER = os.getenv("DEVICE_USER")
 PASS = os.getenv("DEVICE_PASS")
 
+# Drop the URL scheme, turn ':' and '/' into '_' (one regex pass)
+_SAFE_HOST = re.compile(r"https?://|([:/])")
+
 # RESTCONF headers (YANG JSON)
 HEADERS = {
     "Accept": "application/yang-data+json",
     "Content-Type": "application/yang-data+json",
+    "Accept-Encoding": "gzip, deflate",
 }
 
 # In lab/sandbox we usually skip TLS verification due to self-signed certs.
 # DO NOT do this in production.
 VERIFY_TLS = False
+if not VERIFY_TLS:
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# (connect, read) seconds; requests ignores a Session-level timeout attribute
+DEFAULT_TIMEOUT = (5, 15)
 
 session = requests.Session()
 session.auth = (USER, PASS)
 session.headers.update(HEADERS)
 session.verify = VERIFY_TLS
-session.timeout = 15  # seconds
 
 
 def rc_get(relative_path: str):
-    base = f"{HOST}/restconf/data/"
-    # Ensure we are always hitting HOST + /restconf/data/<path>
-    url = base + relative_path
+    url = BASE_URL + relative_path
 
     try:
-        r = session.get(url)
+        r = session.get(url, timeout=DEFAULT_TIMEOUT)
         if r.ok:
             try:
-                return r.json(), r.status_code
+                return orjson.loads(r.content), r.status_code
             except ValueError:
                 return None, r.status_code
         else:
@@ -80,12 +89,29 @@ def get_version():
     return None
 
 
+def get_hostname_and_version():
+    """
+    Fetch hostname and version from the native tree in a single GET.
+    Falls back to get_hostname()/get_version() only when the image rejects `fields` (HTTP 400).
+    """
+    data, code = rc_get("Cisco-IOS-XE-native:native?fields=hostname;version")
+    native = (data or {}).get("Cisco-IOS-XE-native:native")
+    if isinstance(native, dict):
+        return native.get("hostname"), native.get("version")
+    if code == 400:
+        return get_hostname(), get_version()
+    return None, None
+
+
 def get_interfaces_summary():
     """
     Return a list of dicts: [{name, enabled (admin), oper-status}, ...]
     """
-    # ietf-interfaces is widely available
-    data, code = rc_get("ietf-interfaces:interfaces")
+    # ietf-interfaces is widely available; ask only for the leaves we report
+    data, code = rc_get("ietf-interfaces:interfaces?fields=interface(name;enabled;oper-status)")
+    if code == 400:
+        # Image without RESTCONF `fields` support: take the full tree
+        data, code = rc_get("ietf-interfaces:interfaces")
     interfaces = []
 
     if not data:
@@ -108,6 +134,25 @@ def get_interfaces_summary():
     return interfaces
 
 
+def find_serial(data):
+    """
+    Iterative walk over a parsed RESTCONF body for unknown shapes.
+    Returns the first non-empty string under a key containing 'serial', or None.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if "serial" in k and isinstance(v, str) and v:
+                    return v
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
 def get_serial_number():
     """
     Try to fetch serial number via device-hardware YANG (may not exist on all images).
@@ -123,32 +168,41 @@ def get_serial_number():
         data, code = rc_get(p)
         if not data:
             continue
-        # Heuristic search for 'serial' fields
-        json_text = json.dumps(data).lower()
-        if "serial" in json_text:
-            # Try a few common shapes:
-            inv = data.get("Cisco-IOS-XE-device-hardware-oper:device-inventory")
-            if isinstance(inv, list):
-                for item in inv:
-                    sn = item.get("serial-number") or item.get("serial")
-                    if sn:
-                        return sn
-            info = data.get("Cisco-IOS-XE-device-hardware-oper:device-information")
-            if isinstance(info, dict):
-                sn = info.get("serial-number") or info.get("serial")
+        # Try a few common shapes:
+        inv = data.get("Cisco-IOS-XE-device-hardware-oper:device-inventory")
+        if isinstance(inv, list):
+            for item in inv:
+                sn = item.get("serial-number") or item.get("serial")
                 if sn:
                     return sn
+        info = data.get("Cisco-IOS-XE-device-hardware-oper:device-information")
+        if isinstance(info, dict):
+            sn = info.get("serial-number") or info.get("serial")
+            if sn:
+                return sn
+        # Otherwise search the parsed body for any 'serial' field
+        sn = find_serial(data)
+        if sn:
+            return sn
     return None
 
 
+def dump_json(obj, path):
+    """Write obj to path as indented UTF-8 JSON and return the encoded bytes."""
+    data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    path.write_bytes(data)
+    return data
+
+
 def main():
     if not (HOST and USER and PASS):
         raise SystemExit("Please set DEVICE_HOST, DEVICE_USER, DEVICE_PASS in .env")
 
+    hostname, version = get_hostname_and_version()
     payload = {
         "host": HOST,
-        "hostname": get_hostname(),
-        "version": get_version(),
+        "hostname": hostname,
+        "version": version,
         "serial_number": get_serial_number(),
         "interfaces": get_interfaces_summary(),
         "collected_at": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -156,13 +210,12 @@ def main():
 
     # Save to output/
     Path("output").mkdir(parents=True, exist_ok=True)
-    safe_host = HOST.replace("https://", "").replace("http://", "").replace(":", "_").replace("/", "_")
+    safe_host = _SAFE_HOST.sub(lambda m: "_" if m.group(1) else "", HOST)
     out_path = Path("output") / f"device_{safe_host}_{int(time.time())}.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
+    data = dump_json(payload, out_path)
 
     print(f"[OK] Saved: {out_path}")
-    print(json.dumps(payload, indent=2, ensure_ascii=False))
+    print(data.decode("utf-8"))
 
 
 if __name__ == "__main__":
@@ -1,33 +1,55 @@
 import csv
-import json
+import re
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from urllib.parse import urljoin
 
+import orjson
 import requests
+import urllib3
 import yaml
 
+# Lab devices use self-signed certs (verify_tls: false); one warning per request floods stderr
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-def make_session(username: str, password: str, verify_tls: bool = False, timeout: int = 15):
+# Devices are polled concurrently; the work is almost entirely network wait.
+MAX_WORKERS = 16
+
+OUTPUT = Path("output")
+
+# Turns device names/URLs into file-name-safe stems in one pass
+_SAFE_NAME = re.compile(r"://|[:/]")
+
+# (connect, read) timeout in seconds, passed on every request
+DEFAULT_TIMEOUT = (5, 15)
+
+# Independent RESTCONF lookups issued in parallel for each device
+LOOKUPS_PER_DEVICE = 3
+
+
+def make_session(host: str, username: str, password: str, verify_tls: bool = False):
     s = requests.Session()
+    s.restconf_base = f"{host.rstrip('/')}/restconf/data/"  # built once per device
     s.auth = (username, password)
     s.headers.update({
         "Accept": "application/yang-data+json",
         "Content-Type": "application/yang-data+json",
+        "Accept-Encoding": "gzip, deflate",
     })
     s.verify = verify_tls
-    s.timeout = timeout
+    # Plain HTTP/1.1 keep-alive (no HTTP/2: not guaranteed on IOS-XE RESTCONF). The default
+    # adapter pools 10 connections per host, more than the LOOKUPS_PER_DEVICE threads need.
     return s
 
 
-def rc_get(session: requests.Session, host: str, relative_path: str):
-    base = f"{host.rstrip('/')}/restconf/data/"
-    url = base + relative_path  # IMPORTANT: don't treat YANG path as full URL
+def rc_get(session: requests.Session, relative_path: str):
+    url = session.restconf_base + relative_path  # IMPORTANT: don't treat YANG path as full URL
     try:
-        r = session.get(url)
+        r = session.get(url, timeout=DEFAULT_TIMEOUT)
         if r.ok:
             try:
-                return r.json(), r.status_code, None
+                return orjson.loads(r.content), r.status_code, None
             except ValueError:
                 return None, r.status_code, "Invalid JSON"
         return None, r.status_code, r.text
@@ -35,8 +57,8 @@ def rc_get(session: requests.Session, host: str, relative_path: str):
         return None, None, str(e)
 
 
-def get_hostname(session, host):
-    data, code, err = rc_get(session, host, "Cisco-IOS-XE-native:native/hostname")
+def get_hostname(session):
+    data, code, err = rc_get(session, "Cisco-IOS-XE-native:native/hostname")
     if data:
         for k, v in data.items():
             if "hostname" in k:
@@ -44,8 +66,8 @@ def get_hostname(session, host):
     return None
 
 
-def get_version(session, host):
-    data, code, err = rc_get(session, host, "Cisco-IOS-XE-native:native/version")
+def get_version(session):
+    data, code, err = rc_get(session, "Cisco-IOS-XE-native:native/version")
     if data:
         for k, v in data.items():
             if "version" in k:
@@ -53,38 +75,63 @@ def get_version(session, host):
     return None
 
 
-def get_interfaces_summary(session, host):
-    data, code, err = rc_get(session, host, "ietf-interfaces:interfaces")
-    total = up = down = 0
-    items = []
+def get_hostname_and_version(session):
+    # Both leaves in one round trip; images that reject RESTCONF `fields` (400) get the per-leaf GETs
+    data, code, err = rc_get(session, "Cisco-IOS-XE-native:native?fields=hostname;version")
+    native = (data or {}).get("Cisco-IOS-XE-native:native")
+    if isinstance(native, dict):
+        return native.get("hostname"), native.get("version")
+    if code == 400:
+        return get_hostname(session), get_version(session)
+    return None, None
+
+
+def get_interfaces_summary(session):
+    # Only the three leaves we report; fall back to the full tree if `fields` is refused (400).
+    # Timeouts and other errors are not retried, so a dead device costs one GET here.
+    data, code, err = rc_get(session, "ietf-interfaces:interfaces?fields=interface(name;enabled;oper-status)")
+    if code == 400:
+        data, code, err = rc_get(session, "ietf-interfaces:interfaces")
 
     if not data:
-        return items, total, up, down
+        return [], 0, 0, 0
 
     root_key = next(iter(data))  # e.g., "ietf-interfaces:interfaces"
     iface_list = data[root_key].get("interface", [])
 
-    for iface in iface_list:
-        total += 1
-        name = iface.get("name")
-        enabled = iface.get("enabled")
-        oper = iface.get("oper-status")
-        if oper == "up":
-            up += 1
-        elif oper == "down":
-            down += 1
-        items.append({"name": name, "admin_enabled": enabled, "oper_status": oper})
-
-    return items, total, up, down
+    # oper-status may be absent (it can live in a separate state tree), hence .get
+    items = [
+        {"name": iface.get("name"), "admin_enabled": iface.get("enabled"), "oper_status": iface.get("oper-status")}
+        for iface in iface_list
+    ]
+    states = Counter(item["oper_status"] for item in items)
+
+    return items, len(items), states["up"], states["down"]
+
+
+def find_serial(data):
+    """Return the first non-empty string under a '*serial*' key anywhere in data, or None."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for k, v in node.items():
+                if "serial" in k and isinstance(v, str) and v:
+                    return v
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
 
 
-def get_serial_number(session, host):
+def get_serial_number(session):
     candidates = [
         "Cisco-IOS-XE-device-hardware-oper:device-hardware-data/device-hardware/device-inventory",
         "Cisco-IOS-XE-device-hardware-oper:device-hardware-data/device-hardware/device-information",
     ]
     for p in candidates:
-        data, code, err = rc_get(session, host, p)
+        data, code, err = rc_get(session, p)
         if not data:
             continue
         # Try inventory list
@@ -100,12 +147,17 @@ def get_serial_number(session, host):
             sn = info.get("serial-number") or info.get("serial")
             if sn:
                 return sn
+        # Unknown shape: walk the parsed body
+        sn = find_serial(data)
+        if sn:
+            return sn
     return None
 
 
-def collect_for_device(dev):
+def collect_for_device(dev, collected_at):
     """
     dev = dict(host, username, password, name?, verify_tls?)
+    collected_at = run timestamp shared by every device
     returns (payload_dict, error_message_or_None)
     """
     name = dev.get("name") or dev["host"]
@@ -114,7 +166,7 @@ def collect_for_device(dev):
     pwd = dev["password"]
     verify_tls = bool(dev.get("verify_tls", False))
 
-    session = make_session(user, pwd, verify_tls=verify_tls)
+    session = make_session(host, user, pwd, verify_tls=verify_tls)
 
     payload = {
         "device_name": name,
@@ -126,36 +178,49 @@ def collect_for_device(dev):
         "interfaces_total": 0,
         "interfaces_up": 0,
         "interfaces_down": 0,
-        "collected_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "collected_at": collected_at,
     }
 
     try:
-        payload["hostname"] = get_hostname(session, host)
-        payload["version"] = get_version(session, host)
+        # The lookups are independent, so issue them concurrently on the shared session
+        with ThreadPoolExecutor(max_workers=LOOKUPS_PER_DEVICE) as pool:
+            native = pool.submit(get_hostname_and_version, session)
+            interfaces = pool.submit(get_interfaces_summary, session)
+            serial = pool.submit(get_serial_number, session)
+
+            payload["hostname"], payload["version"] = native.result()
 
-        ifaces, total, up, down = get_interfaces_summary(session, host)
-        payload["interfaces"] = ifaces
-        payload["interfaces_total"] = total
-        payload["interfaces_up"] = up
-        payload["interfaces_down"] = down
+            ifaces, total, up, down = interfaces.result()
+            payload["interfaces"] = ifaces
+            payload["interfaces_total"] = total
+            payload["interfaces_up"] = up
+            payload["interfaces_down"] = down
 
-        payload["serial_number"] = get_serial_number(session, host)
+            payload["serial_number"] = serial.result()
 
         return payload, None
     except Exception as e:
         return payload, str(e)
 
 
+def dump_json(obj, path):
+    """Write obj to path as indented UTF-8 JSON."""
+    path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
 def main():
-    Path("output").mkdir(parents=True, exist_ok=True)
+    OUTPUT.mkdir(parents=True, exist_ok=True)
 
     # Load devices.yaml
     with open("devices.yaml", "r", encoding="utf-8") as f:
         cfg = yaml.safe_load(f) or {}
     devices = cfg.get("devices", [])
 
-    ts = time.strftime("%Y%m%d_%H%M%S")
-    csv_path = Path("output") / f"inventory_{ts}.csv"
+    # One clock read per run, reused for file names and every payload
+    now = time.localtime()
+    ts = time.strftime("%Y%m%d_%H%M%S", now)
+    collected_at = time.strftime("%Y-%m-%d %H:%M:%S", now)
+    csv_path = OUTPUT / f"inventory_{ts}.csv"
 
     # Prepare CSV
     fieldnames = [
@@ -167,22 +232,28 @@ def main():
         writer = csv.DictWriter(csvf, fieldnames=fieldnames)
         writer.writeheader()
 
-        for dev in devices:
-            payload, err = collect_for_device(dev)
+        # Poll devices in parallel; rows and files are written from this thread only
+        workers = max(1, min(MAX_WORKERS, len(devices)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(collect_for_device, dev, collected_at) for dev in devices]
+
+            for fut in as_completed(futures):
+                payload, err = fut.result()
 
-            # Save per-device JSON
-            safe_name = (payload["device_name"] or "device").replace("://", "_").replace(":", "_").replace("/", "_")
-            json_path = Path("output") / f"{safe_name}_{ts}.json"
-            with open(json_path, "w", encoding="utf-8") as jf:
-                json.dump(payload, jf, indent=2, ensure_ascii=False)
+                # Save per-device JSON
+                safe_name = _SAFE_NAME.sub("_", payload["device_name"] or "device")
+                json_path = OUTPUT / f"{safe_name}_{ts}.json"
+                dump_json(payload, json_path)
+                # The CSV row only needs the counters; release the interface list now
+                payload["interfaces"] = None
 
-            # Write CSV row
-            row = {k: payload.get(k) for k in fieldnames if k in payload}
-            row["status"] = "ok" if err is None else "error"
-            row["error"] = "" if err is None else err
-            writer.writerow(row)
+                # Write CSV row
+                row = {k: payload.get(k) for k in fieldnames if k in payload}
+                row["status"] = "ok" if err is None else "error"
+                row["error"] = "" if err is None else err
+                writer.writerow(row)
 
-            print(f"[OK] {payload['device_name']} -> JSON: {json_path.name}")
+                print(f"[OK] {payload['device_name']} -> JSON: {json_path.name}")
 
     print(f"[DONE] Inventory CSV: {csv_path}")
 
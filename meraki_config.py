@@ -1,7 +1,10 @@
-import os, time, yaml, json
+import os, time, yaml
 from pathlib import Path
 from dotenv import load_dotenv
 import meraki
+import orjson
+
+OUTPUT = Path("output")
 
 load_dotenv()
 API_KEY = os.getenv("MERAKI_API_KEY") or ""
@@ -9,6 +12,9 @@ if not API_KEY: raise SystemExit("Set MERAKI_API_KEY in .env")
 
 dash = meraki.DashboardAPI(API_KEY, suppress_logging=True, maximum_retries=5)
 
+def dump_json(obj, path):
+  path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
 def find_ids(org_name, net_name):
   orgs = dash.organizations.getOrganizations()
   org = next((o for o in orgs if o["name"] == org_name), None)
@@ -41,14 +47,12 @@ def main():
   # Produce a minimal diff
   changes = {k: v for k, v in desired.items() if current.get(k) != v}
 
-  Path("output").mkdir(exist_ok=True)
+  OUTPUT.mkdir(exist_ok=True)
   ts = time.strftime("%Y%m%d_%H%M%S")
-  (Path("output")/f"meraki_ssid_diff_{ts}.json").write_text(
-      json.dumps({"org":org_name,"network":net_name,"number":number,
-                  "current":current, "desired":desired, "changes":changes}, indent=2),
-      encoding="utf-8"
-  )
-  print(f"[OK] Wrote diff to output/meraki_ssid_diff_{ts}.json")
+  diff_path = OUTPUT / f"meraki_ssid_diff_{ts}.json"
+  dump_json({"org":org_name,"network":net_name,"number":number,
+             "current":current, "desired":desired, "changes":changes}, diff_path)
+  print(f"[OK] Wrote diff to {diff_path}")
 
   # Try to APPLY; handle 403 nicely
   try:
@@ -1,12 +1,33 @@
 import argparse
-import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import orjson
 import requests
+import urllib3
 import yaml
 from jinja2 import Environment, FileSystemLoader
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+
+OUTPUT = Path("output")
+
+# Sandbox devices run with verify_tls: false; silence the per-request warning
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# (connect, read) seconds for each RESTCONF call
+DEFAULT_TIMEOUT = (5, 20)
+
+# Built once; parsed templates stay cached on the environment
+_ENV = Environment(
+    loader=FileSystemLoader("templates"),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+    cache_size=400,
+)
 
 
 # ---------- Common ----------
@@ -14,28 +35,37 @@ def load_yaml(path):
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f) or {}
 
-def make_session(username, password, verify=False, timeout=20):
+def make_session(username, password, verify=False):
     s = requests.Session()
     s.auth = (username, password)
     s.headers.update({
         "Accept": "application/yang-data+json",
         "Content-Type": "application/yang-data+json",
+        "Accept-Encoding": "gzip, deflate",
     })
     s.verify = verify
-    s.timeout = timeout
+    # Keep-alive pool shared by every call to the device; retry transient gateway errors
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
     return s
 
 def rc_get(sess, host, path):
     url = f"{host.rstrip('/')}/restconf/data/{path}"
-    r = sess.get(url)
+    r = sess.get(url, timeout=DEFAULT_TIMEOUT)
     body = {}
     try:
         if r.content:
-            body = r.json()
+            body = orjson.loads(r.content)
     except Exception:
         body = {"_raw": r.text}
     return r.status_code, body
 
+def dump_json(obj, path):
+    """Write obj to path as indented UTF-8 JSON."""
+    path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
 # ---------- Native (hostname, domain, banner, ntp) ----------
 def build_native_payload(intent: dict):
     body = {"Cisco-IOS-XE-native:native": {}}
@@ -64,9 +94,9 @@ def build_native_payload(intent: dict):
 
     return body
 
-def restconf_patch_native(session, host, native_payload):
+def restconf_patch_native(session, host, native_body: bytes):
     url = f"{host.rstrip('/')}/restconf/data/Cisco-IOS-XE-native:native"
-    return session.patch(url, data=json.dumps(native_payload))
+    return session.patch(url, data=native_body, timeout=DEFAULT_TIMEOUT)
 
 # ---------- IETF interfaces (Loopbacks) ----------
 def build_ietf_loopback_payload(lb):
@@ -83,9 +113,9 @@ def build_ietf_loopback_payload(lb):
         }
     }
 
-def restconf_put_interface(session, host, if_name, payload):
+def restconf_put_interface(session, host, if_name, body: bytes):
     url = f"{host.rstrip('/')}/restconf/data/ietf-interfaces:interfaces/interface={if_name}"
-    return session.put(url, data=json.dumps(payload))
+    return session.put(url, data=body, timeout=DEFAULT_TIMEOUT)
 
 # ---------- Checks (intent vs device) ----------
 def check_hostname(sess, host, intent_hostname):
@@ -103,34 +133,36 @@ def check_hostname(sess, host, intent_hostname):
     }
     return result
 
+def _check_one(sess, host, lb):
+    name = f"Loopback{lb['name']}"
+    code, body = rc_get(sess, host, f"ietf-interfaces:interfaces/interface={name}")
+    actual_ip = None
+    if code == 200:
+        try:
+            iface = body.get("ietf-interfaces:interface", {})
+            addrs = iface.get("ietf-ip:ipv4", {}).get("address", [])
+            if addrs:
+                actual_ip = addrs[0].get("ip")
+        except Exception:
+            pass
+    return {
+        "item": f"interface-{name}",
+        "intent": lb["ip"],
+        "actual": actual_ip,
+        "http": code,
+        "match": (lb["ip"] == actual_ip)
+    }
+
 def check_loopbacks(sess, host, intent_loopbacks):
-    results = []
-    for lb in intent_loopbacks or []:
-        name = f"Loopback{lb['name']}"
-        code, body = rc_get(sess, host, f"ietf-interfaces:interfaces/interface={name}")
-        actual_ip = None
-        if code == 200:
-            try:
-                iface = body.get("ietf-interfaces:interface", {})
-                addrs = iface.get("ietf-ip:ipv4", {}).get("address", [])
-                if addrs:
-                    actual_ip = addrs[0].get("ip")
-            except Exception:
-                pass
-        results.append({
-            "item": f"interface-{name}",
-            "intent": lb["ip"],
-            "actual": actual_ip,
-            "http": code,
-            "match": (lb["ip"] == actual_ip)
-        })
-    return results
+    if not intent_loopbacks:
+        return []
+    # One GET per loopback; run them side by side on the session's connection pool
+    with ThreadPoolExecutor(max_workers=min(8, len(intent_loopbacks))) as ex:
+        return list(ex.map(lambda lb: _check_one(sess, host, lb), intent_loopbacks))
 
 # ---------- Rendering ----------
 def render_config(template_path, intent):
-    env = Environment(loader=FileSystemLoader("templates"), trim_blocks=True, lstrip_blocks=True)
-    tpl = env.get_template(Path(template_path).name)
-    return tpl.render(**intent)
+    return _ENV.get_template(Path(template_path).name).render(**intent)
 
 # ---------- Main ----------
 def main():
@@ -151,20 +183,25 @@ def main():
     if not devices:
         raise SystemExit("No devices found in devices.yaml")
 
-    Path("output").mkdir(parents=True, exist_ok=True)
+    OUTPUT.mkdir(parents=True, exist_ok=True)
     ts = time.strftime("%Y%m%d_%H%M%S")
     label = Path(args.intent).stem
 
     # Render once (same for all)
     rendered = render_config(args.template, intent)
-    rendered_path = Path("output") / f"{label}_rendered_{ts}.txt"
+    rendered_path = OUTPUT / f"{label}_rendered_{ts}.txt"
     rendered_path.write_text(rendered, encoding="utf-8")
     print(f"[OK] Rendered config -> {rendered_path}")
 
     native_payload = build_native_payload(intent)
     lbs = intent.get("loopbacks", []) or []
 
+    # Request bodies are identical for every device: encode them once
+    native_body = orjson.dumps(native_payload) if native_payload["Cisco-IOS-XE-native:native"] else None
+    lb_bodies = [(f"Loopback{lb['name']}", orjson.dumps(build_ietf_loopback_payload(lb))) for lb in lbs]
+
     overall_results = []
+    sessions = {}  # (host, user, password, verify_tls) -> Session, reused across devices.yaml entries
 
     for dev in devices:
         name = dev.get("name") or dev["host"]
@@ -174,19 +211,20 @@ def main():
         verify_tls = bool(dev.get("verify_tls", False))
         status = {"device_name": name, "host": host, "steps": [], "checks": []}
 
-        sess = make_session(user, pwd, verify=verify_tls)
+        key = (host, user, pwd, verify_tls)
+        sess = sessions.get(key)
+        if sess is None:
+            sess = sessions[key] = make_session(user, pwd, verify=verify_tls)
 
         # APPLY
         if args.apply:
-            if native_payload["Cisco-IOS-XE-native:native"]:
-                r = restconf_patch_native(sess, host, native_payload)
+            if native_body:
+                r = restconf_patch_native(sess, host, native_body)
                 status["steps"].append(
                     {"op": "native-patch", "http": r.status_code, "ok": r.ok, "err": None if r.ok else r.text}
                 )
-            for lb in lbs:
-                if_name = f"Loopback{lb['name']}"
-                payload = build_ietf_loopback_payload(lb)
-                r = restconf_put_interface(sess, host, if_name, payload)
+            for if_name, body in lb_bodies:
+                r = restconf_put_interface(sess, host, if_name, body)
                 status["steps"].append(
                     {"op": f"put-{if_name}", "http": r.status_code, "ok": r.ok, "err": None if r.ok else r.text}
                 )
@@ -204,8 +242,8 @@ def main():
 
     # Save summary
     summary = {"intent": intent, "results": overall_results, "mode": {"apply": args.apply, "check": args.check}}
-    summary_path = Path("output") / f"{label}_summary_{ts}.json"
-    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    summary_path = OUTPUT / f"{label}_summary_{ts}.json"
+    dump_json(summary, summary_path)
     print(f"[OK] Summary -> {summary_path}")
 
 if __name__ == "__main__":
@@ -1,16 +1,25 @@
 import json
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 HOST = "https://sandbox-iosxe-latest-1.cisco.com:443"
 USER = "developer"
 PWD  = "C1sco12345"
 
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)  # sandbox cert, verify=False below
+
+# One keep-alive connection for all checks against HOST
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=5))
+session.auth = HTTPBasicAuth(USER, PWD)
+session.headers.update({"Accept": "application/yang-data+json"})
+session.verify = False
+
 def get(path):
     url = f"{HOST}/restconf/data/{path}"
-    r = requests.get(url, auth=HTTPBasicAuth(USER, PWD),
-                     headers={"Accept": "application/yang-data+json"},
-                     verify=False, timeout=15)
+    r = session.get(url, timeout=15)
     return r.status_code, (r.json() if r.content else {})
 
 checks = {
@@ -1,35 +1,260 @@
-import os, yaml
-from dotenv import load_dotenv
-import meraki
-
-load_dotenv()
-api_key = os.getenv("MERAKI_API_KEY")
-dash = meraki.DashboardAPI(api_key, suppress_logging=True, maximum_retries=5)
-
-intent = yaml.safe_load(open("intents/meraki_wifi.yaml", "r", encoding="utf-8"))
-org_name = intent["target"]["organization_name"]
-net_name = intent["target"]["network_name"]
-number   = intent["ssid"]["number"]
-
-def find_ids():
-    orgs = dash.organizations.getOrganizations()
-    org = next(o for o in orgs if o["name"] == org_name)
-    nets = dash.organizations.getOrganizationNetworks(org["id"])
-    net = next(n for n in nets if n["name"] == net_name)
-    return org["id"], net["id"]
+import os, sys, time, pickle, hashlib, argparse, logging, yaml
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import fastjsonschema
+import orjson
+
+# libyaml-backed loader when PyYAML was built with it; same safe grammar either way
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+def load_env_file(path=".env"):
+    # Minimal KEY=VALUE reader; variables already in the environment win, as with load_dotenv()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                key = key.strip()
+                if sep and key and not key.startswith("#"):
+                    os.environ.setdefault(key, value.strip().strip('"').strip("'"))
+    except FileNotFoundError:
+        pass
+
+# CI exports the key directly; only read .env when it's missing
+api_key = os.environ.get("MERAKI_API_KEY")
+if not api_key:
+    load_env_file()
+    api_key = os.getenv("MERAKI_API_KEY")
+# Higher-throughput mega-proxy by default; set MERAKI_BASE_URL (e.g. https://api.meraki.com/api/v1) to opt out
+base_url = os.getenv("MERAKI_BASE_URL", "https://api-mp.meraki.com/api/v1")
+# Single-org deployments can export these once (e.g. in CI) to skip discovery calls
+env_org_id = os.getenv("MERAKI_ORG_ID")
+env_net_id = os.getenv("MERAKI_NET_ID")
+# Ties cached IDs and listings to the API key that produced them
+KEY_TAG = hashlib.blake2b((api_key or "").encode(), digest_size=8).hexdigest()
+
+INTENT_PATH = Path("intents/meraki_wifi.yaml")
+# Shape of a Meraki SSID intent (verify_meraki_batch.py validates against it too)
+INTENT_SCHEMA = {
+    "type": "object",
+    "required": ["target", "ssid"],
+    "properties": {
+        "target": {
+            "type": "object",
+            "required": ["organization_name", "network_name"],
+            "properties": {"organization_name": {"type": "string"}, "network_name": {"type": "string"}},
+        },
+        "ssid": {
+            "type": "object",
+            "required": ["number"],
+            "properties": {"number": {"type": "integer", "minimum": 0, "maximum": 14}},
+        },
+    },
+}
+# Compiled once into a plain Python function; catches intent typos before any API call
+_VALIDATE = fastjsonschema.compile(INTENT_SCHEMA)
+# Resolved org/network IDs from a previous run (keyed by the names they were resolved from)
+IDS_CACHE = INTENT_PATH.with_suffix(".ids_cache.yaml")
+
+def load_intent(path):
+    # Parsed intent is pickled next to the YAML, keyed by its mtime and size
+    st = os.stat(path)
+    cache = path.with_name(f"{path.name}.{st.st_mtime_ns}.{st.st_size}.pkl")
+    try:
+        with open(cache, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_Loader)
+    try:
+        for stale in path.parent.glob(f"{path.name}.*.pkl"):
+            stale.unlink()
+        with open(cache, "wb") as f:
+            pickle.dump(data, f, protocol=5)
+    except OSError:
+        pass  # read-only checkout: just parse YAML every run
+    return data
+
+@dataclass(frozen=True, slots=True)
+class Intent:
+    # The few intent fields this script reads, resolved once from the YAML dict
+    org_name: str
+    net_name: str
+    number: int
+    org_id: Optional[str] = None
+    net_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data):
+        target = data["target"]
+        return cls(
+            org_name=sys.intern(target["organization_name"]),
+            net_name=sys.intern(target["network_name"]),
+            number=data["ssid"]["number"],
+            org_id=target.get("organization_id"),
+            net_id=target.get("network_id"),
+        )
+
+@lru_cache(maxsize=1)
+def get_intent():
+    # Loaded on first use, not at import: the pickle cache writes next to the YAML
+    raw = load_intent(INTENT_PATH)
+    try:
+        _VALIDATE(raw)
+    except fastjsonschema.JsonSchemaException as e:
+        raise SystemExit(f"Invalid intent {INTENT_PATH}: {e.message}")
+    return Intent.from_dict(raw)
+
+# SSID properties echoed back by the verify output
+SSID_FIELDS = ("name", "enabled", "authMode", "ipAssignmentMode")
+
+# Org/network listings change rarely; keep them on disk for an hour, scoped per API key
+LIST_CACHE_DIR = Path.home() / ".cache" / "restconf-device-info" / KEY_TAG
+LIST_CACHE_TTL = 3600  # seconds
+
+@lru_cache(maxsize=1)
+def _get_dash():
+    # meraki is heavy to import; only pay for it once an API call is actually needed.
+    # One DashboardAPI per process: its session keeps a single pooled keep-alive client,
+    # so every call reuses the same TLS connection to the Dashboard API.
+    import meraki
+    # No SDK logger, handlers or log file for a three-call script
+    logging.getLogger("meraki").disabled = True
+    # Read-only verify: fail fast on 429/5xx instead of sleeping through retries
+    return meraki.DashboardAPI(api_key, base_url=base_url,
+                               suppress_logging=True, output_log=False, print_console=False,
+                               maximum_retries=1, wait_on_rate_limit=False, nginx_429_retry_wait_time=0)
+
+def _cache_get(key, ttl):
+    path = LIST_CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+def _cache_put(key, value):
+    try:
+        LIST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (LIST_CACHE_DIR / f"{key}.json").write_bytes(orjson.dumps(value))
+    except OSError:
+        pass  # best effort, like _cache_get
+
+def _find_id(key, fetch, name, refresh=False):
+    # A name missing from the cached listing may just be newer than it: fetch the listing once more
+    items = None if refresh else _cache_get(key, LIST_CACHE_TTL)
+    if items is not None:
+        found = next((i["id"] for i in items if i["name"] == name), None)
+        if found:
+            return found
+    items = fetch()
+    _cache_put(key, items)
+    return next((i["id"] for i in items if i["name"] == name), None)
+
+def load_cached_ids():
+    # Unreadable, corrupt or other-key caches are just a miss
+    try:
+        with open(IDS_CACHE, "r", encoding="utf-8") as f:
+            cached = yaml.load(f, Loader=_Loader)
+    except (OSError, yaml.YAMLError):
+        return {}
+    if not isinstance(cached, dict) or cached.get("key") != KEY_TAG:
+        return {}
+    return cached
+
+def save_cached_ids(org_id, net_id):
+    intent = get_intent()
+    try:
+        with open(IDS_CACHE, "w", encoding="utf-8") as f:
+            yaml.safe_dump({"key": KEY_TAG, "organization_name": intent.org_name, "network_name": intent.net_name,
+                            "organization_id": org_id, "network_id": net_id}, f)
+    except OSError:
+        pass  # read-only checkout: resolve by name next time
+
+def drop_cached_ids():
+    try:
+        IDS_CACHE.unlink()
+    except OSError:
+        pass
+
+def find_ids(refresh=False):
+    # refresh=True ignores every cache and re-resolves from live listings.
+    intent = get_intent()
+    # A network ID pinned in the intent or exported as MERAKI_NET_ID is all the SSID GET needs;
+    # an org ID alone (organization_id / MERAKI_ORG_ID) only skips the org listing
+    org_id = intent.org_id or env_org_id
+    net_id = intent.net_id or env_net_id
+    if net_id:
+        return org_id, net_id
+
+    cached = {} if refresh else load_cached_ids()
+    if cached.get("organization_name") == intent.org_name and org_id in (None, cached.get("organization_id")):
+        if cached.get("network_name") == intent.net_name:
+            return cached["organization_id"], cached["network_id"]
+        # Same org, different network: only the network list is needed
+        org_id = cached["organization_id"]
+    if not org_id:
+        # The network lookup depends on this result, so the two calls can't overlap
+        org_id = _find_id("orgs", lambda: _get_dash().organizations.getOrganizations(total_pages="all"),
+                          intent.org_name, refresh)
+        if not org_id:
+            raise SystemExit(f"Org '{intent.org_name}' not found")
+
+    # Every page: the listing is cached, and a truncated copy would keep missing later names
+    net_id = _find_id(f"nets_{org_id}",
+                      lambda: _get_dash().organizations.getOrganizationNetworks(org_id, total_pages="all"),
+                      intent.net_name, refresh)
+    if not net_id:
+        raise SystemExit(f"Network '{intent.net_name}' not found in org '{intent.org_name}'")
+    save_cached_ids(org_id, net_id)
+    return org_id, net_id
+
+def fetch_ssids(net_id, all_ssids):
+    if all_ssids:
+        return _get_dash().wireless.getNetworkWirelessSsids(net_id)
+    # A single SSID: the per-number endpoint returns one object, not all 15
+    return [_get_dash().wireless.getNetworkWirelessSsid(net_id, get_intent().number)]
 
 def main():
+    import meraki
+
+    parser = argparse.ArgumentParser(description="Read back SSID settings from the Meraki Dashboard.")
+    parser.add_argument("--all", action="store_true",
+                        help="Verify every SSID on the network with one API call instead of only the intent's SSID")
+    args = parser.parse_args()
+
+    intent = get_intent()
     org_id, net_id = find_ids()
-    ssid = dash.wireless.getNetworkWirelessSsid(net_id, number)
-    print({
-        "org": org_name,
-        "network": net_name,
-        "number": number,
-        "name": ssid.get("name"),
-        "enabled": ssid.get("enabled"),
-        "authMode": ssid.get("authMode"),
-        "ipAssignmentMode": ssid.get("ipAssignmentMode"),
-    })
+    try:
+        ssids = fetch_ssids(net_id, args.all)
+    except meraki.APIError as e:
+        # Cached IDs may point at a deleted or recreated network: forget them and resolve once more.
+        # A pinned network ID is taken as given.
+        if e.status != 404 or intent.net_id or env_net_id:
+            raise
+        drop_cached_ids()
+        org_id, net_id = find_ids(refresh=True)
+        ssids = fetch_ssids(net_id, args.all)
+
+    # One JSON object per line, ready for jq
+    for ssid in ssids:
+        out = {"org": intent.org_name, "network": intent.net_name, "number": ssid.get("number", intent.number),
+               **{k: ssid.get(k) for k in SSID_FIELDS}}
+        sys.stdout.write(orjson.dumps(out).decode() + "\n")
 
 if __name__ == "__main__":
-    main()
+    import meraki
+    try:
+        main()
+    except meraki.APIError as e:
+        print(f"[ERROR] Meraki API: {e}", file=sys.stderr)
+        # EX_TEMPFAIL only for rate limits and server errors, which a CI re-run can fix;
+        # 401/403/404 and the like would fail the same way again
+        sys.exit(75 if e.status == 429 or (e.status or 0) >= 500 else 1)
@@ -0,0 +1,135 @@
+import sys, asyncio, logging
+from pathlib import Path
+
+import fastjsonschema
+import orjson
+import yaml
+
+# Settings, schema and loader are shared with the single-intent script so the two can't drift
+from verify_meraki import (_Loader, _VALIDATE, SSID_FIELDS, api_key, base_url,
+                           env_org_id, env_net_id)
+
+INTENTS_DIR = Path("intents")
+# Dashboard calls in flight at once on the shared client
+MAX_CONCURRENT = 8
+
+def load_intents(directory=INTENTS_DIR):
+    # Only Meraki SSID intents; IOS-XE intents (site1.yaml) have no target/ssid block
+    intents = []
+    for path in sorted(directory.glob("*.yaml")):
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.load(f, Loader=_Loader) or {}
+        if not isinstance(data, dict) or "target" not in data or "ssid" not in data:
+            continue
+        try:
+            _VALIDATE(data)
+        except fastjsonschema.JsonSchemaException as e:
+            raise SystemExit(f"Invalid intent {path}: {e.message}")
+        intents.append((path.name, data["target"], data["ssid"]["number"]))
+    return intents
+
+async def resolve_ids(aiomeraki, intents):
+    """Map each distinct (org_name, net_name) to its network ID, or the exception that prevented it."""
+    # Several files may name the same pair; keep IDs pinned by any of them
+    pairs = {}
+    for _, t, _ in intents:
+        pair = (t["organization_name"], t["network_name"])
+        org_id, net_id = pairs.get(pair, (None, None))
+        pairs[pair] = (org_id or t.get("organization_id"), net_id or t.get("network_id"))
+    # MERAKI_NET_ID / MERAKI_ORG_ID name one network / org. They only fill gaps when every intent
+    # targets that same network / org; otherwise they'd silently redirect the others.
+    fallback_net = env_net_id if len(pairs) == 1 else None
+    fallback_org = env_org_id if len({org for org, _ in pairs}) == 1 else None
+    for var, value, used, what in (("MERAKI_NET_ID", env_net_id, fallback_net, "network"),
+                                   ("MERAKI_ORG_ID", env_org_id, fallback_org, "org")):
+        if value and not used:
+            print(f"[WARN] {var} ignored: intents name more than one {what}", file=sys.stderr)
+    pairs = {pair: (org_id or fallback_org, net_id or fallback_net) for pair, (org_id, net_id) in pairs.items()}
+    # Only the network ID is needed for the SSID GET
+    ids = {pair: net_id for pair, (_, net_id) in pairs.items() if net_id}
+    pending = [pair for pair in pairs if pair not in ids]
+    if not pending:
+        return ids
+
+    # Lookup failures are stored in place of the ID and only fail the intents that needed them
+    org_ids = {org: org_id for (org, _), (org_id, _) in pairs.items() if org_id}
+    if any(org not in org_ids for org, _ in pending):
+        org_error = None
+        try:
+            by_name = {o["name"]: o["id"] for o in await aiomeraki.organizations.getOrganizations(total_pages="all")}
+        except Exception as e:
+            by_name, org_error = {}, e
+        for org, _ in pending:
+            org_ids.setdefault(org, by_name.get(org) or org_error or LookupError(f"Org '{org}' not found"))
+
+    # Network listings for every org, fetched side by side
+    org_list = list({org_ids[org]: None for org, _ in pending if not isinstance(org_ids[org], Exception)})
+    listings = await asyncio.gather(*(aiomeraki.organizations.getOrganizationNetworks(oid, total_pages="all")
+                                      for oid in org_list), return_exceptions=True)
+    nets_by_org = dict(zip(org_list, listings))
+    for org, net in pending:
+        oid = org_ids[org]
+        nets = oid if isinstance(oid, Exception) else nets_by_org[oid]
+        if isinstance(nets, Exception):
+            ids[(org, net)] = nets
+        else:
+            ids[(org, net)] = (next((n["id"] for n in nets if n["name"] == net), None)
+                               or LookupError(f"Network '{net}' not found in org '{org}'"))
+    return ids
+
+async def main_many(intents):
+    """Print one JSON line per intent (an "error" record if it failed) and return the failures."""
+    import meraki.aio
+    logging.getLogger("meraki").disabled = True
+    # Many requests in flight: unlike verify_meraki.py, wait out 429s rather than fail the whole batch
+    dash = meraki.aio.AsyncDashboardAPI(api_key, base_url=base_url,
+                                        suppress_logging=True, output_log=False, print_console=False,
+                                        wait_on_rate_limit=True, maximum_concurrent_requests=MAX_CONCURRENT)
+    async with dash as aiomeraki:
+        ids = await resolve_ids(aiomeraki, intents)
+        # The same SSID named by several intent files is fetched once
+        keys = list({(net_id, number): None for _, t, number in intents
+                     if not isinstance(net_id := ids[(t["organization_name"], t["network_name"])], Exception)})
+        # return_exceptions: a 404 on one SSID must not discard every other intent's result
+        ssids = await asyncio.gather(*(aiomeraki.wireless.getNetworkWirelessSsid(net_id, number)
+                                       for net_id, number in keys), return_exceptions=True)
+    by_key = dict(zip(keys, ssids))
+
+    failures = []
+    for name, t, number in intents:
+        org, net = t["organization_name"], t["network_name"]
+        net_id = ids[(org, net)]
+        ssid = net_id if isinstance(net_id, Exception) else by_key[(net_id, number)]
+        out = {"intent": name, "org": org, "network": net}
+        if isinstance(ssid, Exception):
+            failures.append(ssid)
+            print(f"[ERROR] {name}: {ssid}", file=sys.stderr)
+            out.update(number=number, error=str(ssid))
+        else:
+            out.update(number=ssid.get("number", number), **{k: ssid.get(k) for k in SSID_FIELDS})
+        sys.stdout.write(orjson.dumps(out).decode() + "\n")
+    return failures
+
+def _retryable(e):
+    # 75 (EX_TEMPFAIL) = worth retrying the job: rate limits and server errors only
+    status = getattr(e, "status", None)
+    return status == 429 or (status or 0) >= 500
+
+def main():
+    if not api_key:
+        raise SystemExit("Set MERAKI_API_KEY in .env")
+    intents = load_intents()
+    if not intents:
+        raise SystemExit(f"No Meraki SSID intents found in {INTENTS_DIR}/")
+    failures = asyncio.run(main_many(intents))
+    if failures:
+        print(f"[ERROR] {len(failures)} of {len(intents)} intent(s) failed", file=sys.stderr)
+        sys.exit(75 if all(map(_retryable, failures)) else 1)
+
+if __name__ == "__main__":
+    import meraki
+    try:
+        main()
+    except meraki.APIError as e:
+        print(f"[ERROR] Meraki API: {e}", file=sys.stderr)
+        sys.exit(75 if _retryable(e) else 1)